@@ -1,8 +1,13 @@
+import logging
+import time
+
 from fastapi import APIRouter, File, HTTPException, UploadFile
 
 from app.core.config import settings
 from app.services.image_splitter import generate_and_upload_images
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix=settings.API_V1_STR, tags=["Image Splitter"])
 
 
@@ -18,17 +23,19 @@ async def split_image(image_file: UploadFile = File(...)) -> dict:
         JSON with generated images and their URLs
     """
     try:
-        print(f"[split_image] Received request with file: {image_file.filename}")
-        start_time = __import__('time').time()
+        logger.info("[split_image] Received request with file: %s", image_file.filename)
+        start_time = time.perf_counter()
         # Call service layer to handle all business logic
         generated_items = await generate_and_upload_images(
             image_file=image_file,
             bucket_name=settings.MINIO_PUBLIC_BUCKET_NAME,
         )
 
-        print(f"[split_image] Successfully processed {len(generated_items)} items")
-        end_time = __import__('time').time()
-        print(f"[split_image] Total processing time: {end_time - start_time:.2f} seconds")
+        logger.info(
+            "[split_image] Processed %d items in %.2f seconds",
+            len(generated_items),
+            time.perf_counter() - start_time,
+        )
         return {
             "success": True,
             "message": f"Successfully generated {len(generated_items)} images",
@@ -36,5 +43,5 @@ async def split_image(image_file: UploadFile = File(...)) -> dict:
         }
 
     except Exception as e:
-        print(f"[split_image] ERROR: {e}")
+        logger.error("[split_image] ERROR: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,27 +1,32 @@
 """
 Virtual Try-On API endpoints for generating try-on visualizations.
 """
+import asyncio
 import json
 import logging
+import time
 from datetime import datetime
 from uuid import uuid4
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
 
 from app.core.config import settings
-from app.jobs.tasks import upload_image_task
-from app.schemas.virtual_tryon import (
-    ClothingItemSchema,
-    VirtualTryOnResponseSchema,
-)
+from app.schemas.virtual_tryon import VirtualTryOnResponseSchema
 from app.services.virtual_tryon_service import (
+    build_tryon_cache_key,
+    cache_tryon_url,
+    get_cached_tryon_url,
+    parse_clothing_urls,
     validate_clothing_items,
     validate_human_image,
 )
 from app.utils.image_workflow import generate_tryon_image
+from app.utils.minio import generate_presigned_url, upload_bytes_to_minio
 
 logger = logging.getLogger(__name__)
 
+PUBLIC_BUCKET_NAME = settings.MINIO_PUBLIC_BUCKET_NAME
+
 router = APIRouter(prefix=settings.API_V1_STR, tags=["Virtual Try-On"])
 
 
@@ -34,14 +39,14 @@ router = APIRouter(prefix=settings.API_V1_STR, tags=["Virtual Try-On"])
 )
 async def create_tryon_request(
     human_image: UploadFile = File(..., description="Full-body human image (JPEG, PNG, or WebP)"),
-    clothing_urls: list[str] = None,
+    clothing_urls: str = Form(..., description="Comma-separated list of 1-3 clothing item URLs"),
 ) -> VirtualTryOnResponseSchema:
     """
     Generate virtual try-on image synchronously.
 
     Args:
         human_image: Uploaded human image file
-        clothing_urls: List of 1-3 clothing item URLs
+        clothing_urls: Comma-separated list of 1-3 clothing item URLs
 
     Returns:
         VirtualTryOnResponseSchema with result URL
@@ -50,67 +55,74 @@ async def create_tryon_request(
         HTTPException: 400 if inputs invalid, 500 if generation fails
     """
     try:
-        print("[create_tryon_request] Started")
-        print(f"[create_tryon_request] Human image: {clothing_urls}")
-        start_time = __import__('time').time()
-        # Validate human image
-        human_image_bytes = await human_image.read()
-        if not human_image_bytes:
+        logger.info("[create_tryon_request] Started with clothing URLs: %s", clothing_urls)
+        start_time = time.perf_counter()
+        # Validate clothing URLs (cheap) before decoding the image
+        urls = parse_clothing_urls(clothing_urls)
+        validate_clothing_items(urls)
+        logger.debug("[create_tryon_request] Validated %d clothing items", len(urls))
+
+        # Validate human image straight from the spooled upload (no full read into memory)
+        if not human_image.size:
             raise ValueError("Human image file is empty")
 
-        converted_image_bytes, mime_type = validate_human_image(human_image_bytes)
-        print(f"[create_tryon_request] Human image validated: {len(converted_image_bytes)} bytes")
-        clothing_urls = clothing_urls[0].split(",") if clothing_urls else []
-        # Validate clothing URLs
-        if not clothing_urls:
-            raise ValueError("At least one clothing item URL is required")
-        
-        if len(clothing_urls) > 3:
-            raise ValueError("Maximum 3 clothing items allowed")
+        # File reads (large uploads spill to disk) and the PIL work run off the event loop
+        converted_image_bytes, mime_type = await asyncio.to_thread(validate_human_image, human_image.file)
+        logger.debug("[create_tryon_request] Human image validated: %d bytes", len(converted_image_bytes))
 
-        clothing_items = [ClothingItemSchema(image_url=url) for url in clothing_urls]
-        validate_clothing_items(clothing_items)
-        print(f"[create_tryon_request] Validated {len(clothing_items)} clothing items")
+        # Identical inputs already generated: skip Gemini and the upload entirely
+        # (hashing a multi-MB image is CPU work, so the key is built off the event loop)
+        cache_key = await asyncio.to_thread(build_tryon_cache_key, converted_image_bytes, urls)
+        cached_url = await get_cached_tryon_url(cache_key)
+        if cached_url:
+            elapsed = time.perf_counter() - start_time
+            logger.info("[create_tryon_request] Cache hit %s in %.2f seconds", cached_url, elapsed)
+            return VirtualTryOnResponseSchema(time=f"{elapsed:.2f}", url=cached_url)
 
         # Generate try-on image
         task_id = str(uuid4())
-        print(f"[create_tryon_request] Generating try-on image: {task_id}")
-        
-        import asyncio
-        result = await generate_tryon_image(converted_image_bytes, clothing_urls, task_id)
+        logger.info("[create_tryon_request] Generating try-on image: %s", task_id)
+
+        result = await generate_tryon_image(converted_image_bytes, urls, task_id)
         
         if not result["success"]:
             raise Exception(result.get("error", "Generation failed"))
 
-        print(f"[create_tryon_request] Generated image: {len(result['image_bytes'])} bytes")
+        logger.debug("[create_tryon_request] Generated image: %d bytes", len(result["image_bytes"]))
 
-        # Upload to MinIO using Celery task
+        # Upload to MinIO directly; the blocking SDK calls run in a worker thread
         file_name = f"tryon_{task_id}.jpg"
-        print(f"[create_tryon_request] Uploading to MinIO: {file_name}")
-        
-        upload_task = upload_image_task.apply_async(
-            args=[result["image_bytes"], file_name, settings.MINIO_PUBLIC_BUCKET_NAME],
-            countdown=0,
+        logger.debug("[create_tryon_request] Uploading to MinIO: %s", file_name)
+
+        uploaded = await asyncio.to_thread(
+            upload_bytes_to_minio,
+            result["image_bytes"],
+            PUBLIC_BUCKET_NAME,
+            file_name,
+            "image/jpeg",
         )
-        
-        upload_result = upload_task.get(timeout=120)
-        print(f"[create_tryon_request] Upload result: {upload_result}")
-        
-        if not upload_result or not upload_result.get("success"):
+
+        if not uploaded:
             raise Exception("Failed to upload to MinIO")
 
-        result_url = upload_result.get("url")
-        print(f"[create_tryon_request] Generated URL: {result_url}")
-        end_time = __import__('time').time()
-        print(f"[split_image] Total processing time: {end_time - start_time:.2f} seconds")
+        result_url = await asyncio.to_thread(
+            generate_presigned_url,
+            PUBLIC_BUCKET_NAME,
+            file_name,
+        )
+        if not result_url:
+            raise Exception("Failed to generate image URL")
+        await cache_tryon_url(cache_key, result_url)
+        elapsed = time.perf_counter() - start_time
+        logger.info("[create_tryon_request] Generated URL %s in %.2f seconds", result_url, elapsed)
         return VirtualTryOnResponseSchema(
-            time=str(f"{end_time - start_time:.2f}"),
+            time=f"{elapsed:.2f}",
             url=result_url
         )
 
     except ValueError as e:
-        print(f"[create_tryon_request] Validation error: {e}")
+        logger.warning("[create_tryon_request] Validation error: %s", e)
         raise HTTPException(status_code=400, detail={"error": str(e)})
     except Exception as e:
-        print(f"[create_tryon_request] Error: {e}")
+        logger.error("[create_tryon_request] Error: %s", e)
         raise HTTPException(status_code=500, detail={"error": str(e)})
@@ -1,4 +1,5 @@
 import secrets
+from functools import cached_property
 from typing import Annotated
 
 from pydantic import (
@@ -25,6 +26,9 @@ class Settings(BaseSettings):
     SERVER_HOST: str = "http://localhost"
     SERVER_PORT: int = 8081
 
+    # Logging Configuration
+    LOG_LEVEL: str = "INFO"
+
     # CORS Configuration
     BACKEND_CORS_ORIGINS: Annotated[
         list[AnyUrl] | str,
@@ -47,6 +51,9 @@ class Settings(BaseSettings):
     MINIO_BUCKET_NAME: str = "sop"
     MINIO_PUBLIC_BUCKET_NAME: str = "sop"
     MINIO_PUBLIC_URL: str = "http://localhost:9000"
+    MINIO_UPLOAD_PART_SIZE: int = 64 * 1024 * 1024  # Multipart part size (bytes)
+    MINIO_UPLOAD_PARALLELISM: int = 4  # Concurrent part uploads for multipart PUTs
+    MINIO_HTTP_POOL_SIZE: int = 32  # Pooled connections per host, sized for concurrent uploads
 
     # File Configuration
     MAX_FILE_SIZE_MB: int = 100
@@ -56,13 +63,14 @@ class Settings(BaseSettings):
     # Google AI Configuration
     GOOGLE_API_KEY: str = ""
 
+    # Derived URLs are built once per Settings instance
     @computed_field  # type: ignore[prop-decorator]
-    @property
+    @cached_property
     def CELERY_BROKER_URL(self) -> str:
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
 
-    @computed_field
-    @property
+    @computed_field  # type: ignore[prop-decorator]
+    @cached_property
     def CELERY_RESULT_BACKEND(self) -> str:
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
 
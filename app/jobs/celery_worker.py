@@ -1,4 +1,8 @@
+import asyncio
+import threading
+
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 
 from app.core.config import settings
 
@@ -17,9 +21,60 @@ celery_app.conf.update(
     # Worker settings
     worker_prefetch_multiplier=1,
     task_acks_late=True,
-    worker_max_tasks_per_child=50,
+    # worker_max_tasks_per_child is passed to the generation worker in start.sh
+    # Serialization: msgpack stores bytes natively (JSON would base64 them, +33%).
+    # Images are normally passed by Redis/MinIO key, so this mainly protects the
+    # remaining byte-carrying paths (e.g. generate_tryon_image_task). pickle is
+    # not used: it would let any broker writer execute code in the workers.
+    task_serializer="msgpack",
+    result_serializer="msgpack",
+    accept_content=["msgpack"],
+    result_accept_content=["msgpack"],
     # Retry settings
     task_default_retry_delay=60,
     task_max_retries=3,
+    # Routing: Gemini-bound tasks run on the dedicated generation worker
+    task_routes={
+        "generate_and_upload_task": {"queue": "generation"},
+        "generate_tryon_image_task": {"queue": "generation"},
+    },
 )
 
+
+# Event loop reused by async task bodies, one per worker thread
+_loop_state = threading.local()
+
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()
+
+
+def get_worker_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the persistent event loop for the current worker thread, creating it on first use.
+    """
+    loop = getattr(_loop_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _new_event_loop()
+        _loop_state.loop = loop
+    return loop
+
+
+@worker_process_init.connect
+def _init_worker_process(**_):
+    # A loop or Gemini client inherited from the parent must not be reused after fork
+    from app.utils.image_workflow import reset_gemini_client
+
+    _loop_state.loop = _new_event_loop()
+    reset_gemini_client()
+
+
+@worker_process_shutdown.connect
+def _close_worker_event_loop(**_):
+    loop = getattr(_loop_state, "loop", None)
+    if loop is not None and not loop.is_closed():
+        loop.close()
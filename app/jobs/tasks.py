@@ -1,95 +1,89 @@
-import json
 import logging
+import uuid
 from datetime import datetime
 
-from app.core.config import settings
-from app.jobs.celery_worker import celery_app
-from app.utils.image_workflow import generate_image_from_bytes, generate_tryon_image
+import httpx
+import orjson
+from google.genai import errors as genai_errors
+
+from app.jobs.celery_worker import celery_app, get_worker_event_loop
+from app.utils.image_workflow import (
+    GeminiRateLimitError,
+    generate_image_from_bytes,
+    generate_tryon_image,
+)
 from app.utils.minio import generate_presigned_url, upload_bytes_to_minio
-from app.utils.redis import get_redis_client
+from app.utils.redis import load_staged_bytes, set_task_status
 
 logger = logging.getLogger(__name__)
 
-
-@celery_app.task(bind=True, name="generate_image_task")
-def generate_image_task(self, file_bytes: bytes, mime_type: str, category: str):
+# Retry policy for Gemini-backed tasks: only transient failures (5xx, rate
+# limits, network errors) are retried with exponential backoff; invalid
+# requests, safety blocks and configuration errors fail immediately
+GENERATION_RETRY_POLICY = {
+    "autoretry_for": (
+        genai_errors.ServerError,
+        GeminiRateLimitError,
+        httpx.TransportError,
+        TimeoutError,
+        ConnectionError,
+    ),
+    "retry_backoff": 2,
+    "retry_backoff_max": 30,
+    "retry_jitter": True,
+    "max_retries": 3,
+}
+
+
+@celery_app.task(name="generate_and_upload_task", **GENERATION_RETRY_POLICY)
+def generate_and_upload_task(input_key: str, mime_type: str, category: str, bucket_name: str):
     """
-    Generate image for given category using Celery task (runs in background worker).
+    Generate image for given category and upload it to MinIO in one Celery task.
+
+    The generated bytes never leave the worker: only the small upload metadata
+    is returned through the result backend.
 
     Args:
-        file_bytes: Image file bytes (already validated and converted)
+        input_key: Redis key of the staged input image (already validated and converted)
         mime_type: MIME type of image
         category: Category name (Top or Bot)
-
-    Returns:
-        Dict with generated image data and metadata
-    """
-    try:
-        logger.info(f"[generate_image_task] Started for category: {category}")
-
-        # Call synchronous generate_image_from_bytes
-        generated_image_bytes = generate_image_from_bytes(file_bytes, mime_type, category)
-
-        if not generated_image_bytes:
-            logger.error(f"[generate_image_task] No image generated for category: {category}")
-            return {"success": False, "category": category}
-
-        logger.info(f"[generate_image_task] Completed for {category}: {len(generated_image_bytes)} bytes")
-        return {
-            "success": True,
-            "category": category,
-            "image_bytes": generated_image_bytes,
-        }
-    except Exception as e:
-        logger.error(f"[generate_image_task] ERROR: {e}")
-        self.retry(exc=e, countdown=5, max_retries=2)
-
-
-@celery_app.task(bind=True, name="upload_image_task")
-def upload_image_task(self, image_bytes: bytes, file_name: str, bucket_name: str):
-    """
-    Upload generated image to MinIO using Celery task.
-
-    Args:
-        image_bytes: Image bytes to upload
-        file_name: Filename in MinIO
         bucket_name: Bucket name
 
     Returns:
-        Dict with upload result (url, filename, category)
+        Dict with upload result (url, filename, category, size)
     """
-    try:
-        logger.info(f"[upload_image_task] Started for: {file_name}")
-
-        # Upload to MinIO
-        success = upload_bytes_to_minio(
-            file_bytes=image_bytes,
-            bucket_name=bucket_name,
-            object_name=file_name,
-            content_type="image/jpeg",
-        )
-
-        if success:
-            logger.info(f"[upload_image_task] Successfully uploaded {file_name}")
-            public_url = generate_presigned_url(bucket_name, file_name)
-            logger.info(f"[upload_image_task] Generated URL: {public_url}")
-
-            # Extract category from filename (e.g., "generated_Top_abc123.jpg")
-            category = file_name.split("_")[1]
-
-            return {
-                "success": True,
-                "category": category,
-                "url": public_url,
-                "filename": file_name,
-            }
-        else:
-            logger.error(f"[upload_image_task] Failed to upload {file_name}")
-            return {"success": False, "filename": file_name}
-
-    except Exception as e:
-        logger.error(f"[upload_image_task] ERROR: {e}")
-        self.retry(exc=e, countdown=5, max_retries=2)
+    logger.info(f"[generate_and_upload_task] Started for category: {category}")
+
+    file_bytes = load_staged_bytes(input_key)
+    if not file_bytes:
+        logger.error(f"[generate_and_upload_task] Staged input {input_key} missing for category: {category}")
+        return {"success": False, "category": category}
+
+    generated_image_bytes = generate_image_from_bytes(file_bytes, mime_type, category)
+
+    if not generated_image_bytes:
+        logger.error(f"[generate_and_upload_task] No image generated for category: {category}")
+        return {"success": False, "category": category}
+
+    file_name = f"generated_{category}_{uuid.uuid4().hex[:8]}.jpg"
+    if not upload_bytes_to_minio(
+        file_bytes=generated_image_bytes,
+        bucket_name=bucket_name,
+        object_name=file_name,
+        content_type="image/jpeg",
+    ):
+        logger.error(f"[generate_and_upload_task] Failed to upload {file_name}")
+        return {"success": False, "category": category, "filename": file_name}
+
+    public_url = generate_presigned_url(bucket_name, file_name)
+    logger.info(f"[generate_and_upload_task] Uploaded {file_name} ({len(generated_image_bytes)} bytes)")
+    return {
+        "success": True,
+        "category": category,
+        "url": public_url,
+        "filename": file_name,
+        "size": len(generated_image_bytes),
+    }
 
 
 @celery_app.task(bind=True, name="generate_tryon_image_task", time_limit=150)
@@ -114,13 +108,10 @@ def generate_tryon_image_task(
         logger.info(f"[generate_tryon_image_task] Started for task_id: {task_id}")
 
         # Parse clothing URLs
-        clothing_urls = json.loads(clothing_urls_json)
-        
-        # Call async-compatible generation function
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        clothing_urls = orjson.loads(clothing_urls_json)
         
+        # Run the async generation on this worker's persistent event loop
+        loop = get_worker_event_loop()
         result = loop.run_until_complete(
             generate_tryon_image(
                 human_image_bytes=human_image_bytes,
@@ -128,7 +119,6 @@ def generate_tryon_image_task(
                 task_id=task_id,
             )
         )
-        loop.close()
 
         if result["success"]:
             logger.info(f"[generate_tryon_image_task] Generation completed for {task_id}")
@@ -140,8 +130,7 @@ def generate_tryon_image_task(
     except Exception as e:
         logger.error(f"[generate_tryon_image_task] ERROR: {e}")
         try:
-            redis_client = get_redis_client()
-            redis_client.hset(f"tryon_task:{task_id}", mapping={
+            set_task_status(f"tryon_task:{task_id}", {
                 "status": "failed",
                 "error": str(e),
                 "updated_at": datetime.utcnow().isoformat(),
@@ -1,4 +1,6 @@
+import asyncio
 from typing import Any, Dict
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
@@ -6,6 +8,16 @@ from fastapi.routing import APIRouter
 
 from app.api import api_router
 from app.core.config import settings
+from app.core.logging_config import setup_logging
+
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
+if uvloop is not None:
+    # libuv-based event loop: lower per-iteration overhead for I/O-bound endpoints
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 
 def custom_generate_unique_id(route: APIRouter) -> str:
@@ -64,42 +76,8 @@ def custom_openapi():
     return openapi_schema
 
 
-app = FastAPI(
-    title="ISplitterBE",
-    version="1.0.0",
-    contact={
-        "name": "ISplitter Team",
-        "email": "support@ISplitter.com",
-    },
-    license_info={
-        "name": "MIT",
-    },
-    root_path="/be",
-    # Custom operation ID generation for better client code
-    generate_unique_id_function=custom_generate_unique_id,
-)
-@app.middleware("http")
-async def log_requests(request, call_next):
-    print(f"[REQUEST] {request.method} {request.url}")
-    response = await call_next(request)
-    print(f"\033[92m[RESPONSE]\033[0m {response.__class__.__name__}({response.status_code if hasattr(response, 'status_code') else 'streaming'}, {getattr(response, 'media_type', 'unknown')})")
-
-    try:
-        if hasattr(response, 'body'):
-            body_content = response.body.decode('utf-8', errors='ignore')
-            # Limit body size to avoid flooding logs
-            if len(body_content) > 500:
-                body_content = body_content[:500] + "..."
-            print(f"\033[93m[RESPONSE BODY]\033[0m {body_content}")
-        elif hasattr(response, 'content') and response.content:
-            body_content = response.content.decode('utf-8', errors='ignore')
-            if len(body_content) > 500:
-                body_content = body_content[:500] + "..."
-            print(f"\033[93m[RESPONSE BODY]\033[0m {body_content}")
-    except Exception as e:
-        print(f"\033[91m[BODY LOG ERROR]\033[0m Could not read response body: {e}")
+setup_logging(settings.LOG_LEVEL)
 
-    return response
 app = FastAPI(
     title="ISplitterBE",
     version="1.0.0",
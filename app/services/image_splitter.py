@@ -1,10 +1,35 @@
-import uuid
+import asyncio
+import logging
 
+from celery import Signature, group
+from celery.exceptions import TimeoutError as CeleryTimeoutError
 from fastapi import UploadFile
 
-from app.jobs.tasks import generate_image_task, upload_image_task
+from app.jobs.tasks import generate_and_upload_task
 from app.utils.image_workflow import _validate_and_convert_image
 from app.utils.image_workflow.prompt import CATEGORIES
+from app.utils.redis import delete_staged_bytes, stage_bytes
+
+logger = logging.getLogger(__name__)
+
+
+def _dispatch_and_join(signatures: list[Signature], timeout: float) -> list:
+    """
+    Publish a Celery group and collect all its results in one native backend wait.
+
+    Runs entirely on one thread: the result backend is thread-local, so the
+    thread that subscribed to the task results must also be the one draining them.
+    group.apply_async already publishes every message over one acquired producer.
+
+    Failed tasks yield their exception instead of raising. On timeout, results
+    of the tasks that did finish are kept and the rest are None.
+    """
+    job = group(signatures).apply_async()
+    try:
+        return job.join_native(timeout=timeout, propagate=False)
+    except CeleryTimeoutError:
+        logger.warning("[generate_and_upload_images] Timed out after %ss waiting for group %s", timeout, job.id)
+        return [result.result if result.ready() else None for result in job.results]
 
 
 async def generate_and_upload_images(
@@ -21,84 +46,42 @@ async def generate_and_upload_images(
     Returns:
         List of dicts with generated image info
     """
-    print(f"[generate_and_upload_images] Starting image generation for bucket: {bucket_name}")
+    logger.info("[generate_and_upload_images] Starting image generation for bucket: %s", bucket_name)
 
     generated_items = []
 
     # Read file content ONCE
-    print("[generate_and_upload_images] Reading image file content...")
+    logger.debug("[generate_and_upload_images] Reading image file content...")
     file_content = await image_file.read()
-    print(f"[generate_and_upload_images] File content read: {len(file_content)} bytes")
+    logger.debug("[generate_and_upload_images] File content read: %d bytes", len(file_content))
 
     # Validate and convert image to JPEG
-    print("[generate_and_upload_images] Validating and converting image...")
-    converted_bytes, mime_type = _validate_and_convert_image(file_content)
-    print(f"[generate_and_upload_images] Image validated: {len(converted_bytes)} bytes, MIME: {mime_type}")
-
-    # Phase 1: Submit generation tasks to Celery for PARALLEL execution
-    print(f"[generate_and_upload_images] Submitting {len(CATEGORIES)} generation tasks to Celery...")
-    generation_tasks = []
-
-    for category_name in CATEGORIES.keys():
-        # Submit task to Celery (runs in background worker)
-        celery_task = generate_image_task.apply_async(
-            args=[converted_bytes, mime_type, category_name],
-            countdown=0,
-        )
-        generation_tasks.append((category_name, celery_task))
-        print(f"[generate_and_upload_images] Submitted generation task for {category_name}: {celery_task.id}")
-
-    # Wait for all generation tasks to complete
-    print(f"[generate_and_upload_images] Waiting for {len(generation_tasks)} generation tasks...")
-    generated_results = {}
-
-    for category_name, celery_task in generation_tasks:
-        try:
-            result = celery_task.get(timeout=120)  # 2 minute timeout for generation
-            print(f"[generate_and_upload_images] Generation task for {category_name} completed")
-
-            if result and result.get("success"):
-                generated_results[category_name] = result
-            else:
-                print(f"[generate_and_upload_images] Generation failed for {category_name}: {result}")
-        except Exception as e:
-            print(f"[generate_and_upload_images] ERROR waiting for {category_name} generation: {e}")
-            continue
-
-    # Phase 2: Submit upload tasks to Celery for PARALLEL upload
-    print(f"[generate_and_upload_images] Submitting {len(generated_results)} upload tasks to Celery...")
-    upload_tasks = []
-
-    for category_name, gen_result in generated_results.items():
-        image_bytes = gen_result.get("image_bytes")
-        if not image_bytes:
-            print(f"[generate_and_upload_images] No image bytes for {category_name}, skipping upload...")
-            continue
-
-        file_name = f"generated_{category_name}_{uuid.uuid4().hex[:8]}.jpg"
-        print(f"[generate_and_upload_images] Submitting upload task: {file_name}")
-
-        celery_task = upload_image_task.apply_async(
-            args=[image_bytes, file_name, bucket_name],
-            countdown=0,
-        )
-        upload_tasks.append((category_name, celery_task))
-
-    # Wait for all upload tasks to complete
-    print(f"[generate_and_upload_images] Waiting for {len(upload_tasks)} upload tasks...")
-    for category_name, celery_task in upload_tasks:
-        try:
-            result = celery_task.get(timeout=120)  # 2 minute timeout for upload
-            print(f"[generate_and_upload_images] Upload task for {category_name} completed")
-
-            if result and result.get("success"):
-                generated_items.append(result)
-            else:
-                print(f"[generate_and_upload_images] Upload failed for {category_name}: {result}")
-        except Exception as e:
-            print(f"[generate_and_upload_images] ERROR waiting for {category_name} upload: {e}")
-            continue
-
-    print(f"[generate_and_upload_images] Completed - Generated and uploaded {len(generated_items)} images")
+    logger.debug("[generate_and_upload_images] Validating and converting image...")
+    converted_bytes, mime_type = await asyncio.to_thread(_validate_and_convert_image, file_content)
+    logger.debug("[generate_and_upload_images] Image validated: %d bytes, MIME: %s", len(converted_bytes), mime_type)
+
+    # Stage the input once in Redis; tasks receive only its key
+    input_key = await asyncio.to_thread(stage_bytes, converted_bytes, "split:input:")
+
+    try:
+        # Generate and upload each category in one task, all categories in PARALLEL
+        categories = list(CATEGORIES.keys())
+        logger.debug("[generate_and_upload_images] Submitting %d generate+upload tasks to Celery...", len(categories))
+        # Publish and wait on the same worker thread, off the event loop
+        results = await asyncio.to_thread(_dispatch_and_join, [
+            generate_and_upload_task.s(input_key, mime_type, category_name, bucket_name)
+            for category_name in categories
+        ], 240)
+    finally:
+        # Every task has finished (or timed out): release the staged input now, not at TTL expiry
+        await asyncio.to_thread(delete_staged_bytes, input_key)
+
+    for category_name, result in zip(categories, results, strict=True):
+        if isinstance(result, dict) and result.get("success"):
+            generated_items.append(result)
+        else:
+            logger.warning("[generate_and_upload_images] Generation/upload failed for %s: %s", category_name, result)
+
+    logger.info("[generate_and_upload_images] Completed - Generated and uploaded %d images", len(generated_items))
     return generated_items
 
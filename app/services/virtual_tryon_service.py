@@ -4,27 +4,32 @@ Virtual Try-On service layer with core business logic.
 This module handles validation, prompt construction, and file persistence
 for the virtual try-on feature.
 """
-import base64
-import io
-import os
-from datetime import datetime
-from pathlib import Path
-from typing import Optional
+import hashlib
+import logging
+from typing import BinaryIO, Optional
 
 from PIL import Image
 
-from app.schemas.virtual_tryon import ClothingItemSchema
+from app.utils.image_workflow import _encode_jpeg, _flatten_to_rgb
+from app.utils.redis import get_async_redis_client
 
+logger = logging.getLogger(__name__)
 
-def validate_human_image(file_bytes: bytes) -> tuple[bytes, str]:
+TRYON_CACHE_TTL = 86400  # Seconds a generated try-on URL is reused for identical inputs
+
+
+def validate_human_image(image_file: BinaryIO) -> tuple[bytes, str]:
     """
     Validate image format and convert to JPEG for maximum compatibility.
 
     Validates that the image is in a supported format (JPEG, PNG, or WebP),
-    converts it to JPEG, and handles RGBA to RGB conversion.
+    converts it to JPEG, and handles RGBA to RGB conversion. Format and size
+    checks only read headers. Pillow's verify() only checks PNG integrity, so
+    JPEG inputs that need no conversion are checked with a cheap 1/8-scale
+    decode (which rejects truncated files) and then returned as-is.
 
     Args:
-        file_bytes: Raw image bytes from uploaded file
+        image_file: File-like object positioned anywhere (e.g. UploadFile.file)
 
     Returns:
         Tuple of (converted_image_bytes, mime_type)
@@ -34,7 +39,8 @@ def validate_human_image(file_bytes: bytes) -> tuple[bytes, str]:
     """
     try:
         # Open and validate image
-        img = Image.open(io.BytesIO(file_bytes))
+        image_file.seek(0)
+        img = Image.open(image_file)
 
         # Check supported formats
         supported_formats = {"JPEG", "PNG", "WEBP"}
@@ -51,20 +57,25 @@ def validate_human_image(file_bytes: bytes) -> tuple[bytes, str]:
                 f"Minimum required: 100x100 pixels"
             )
 
-        # Convert RGBA to RGB
-        if img.mode == "RGBA":
-            rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-            rgb_img.paste(img, mask=img.split()[3])
-            img = rgb_img
-        elif img.mode not in ("RGB", "L"):
-            img = img.convert("RGB")
+        # Check file integrity without decoding pixels (PNG checksums; a no-op for JPEG)
+        image_file.seek(0)
+        Image.open(image_file).verify()
+
+        # Already a JPEG Gemini can consume: skip the full decode/re-encode, but
+        # decode at 1/8 scale so truncated or corrupt JPEGs are still rejected
+        image_file.seek(0)
+        if img.format == "JPEG" and img.mode in ("RGB", "L"):
+            img = Image.open(image_file)
+            img.draft(img.mode, (img.size[0] // 8, img.size[1] // 8))
+            img.load()
+            image_file.seek(0)
+            return image_file.read(), "image/jpeg"
 
-        # Convert to JPEG for maximum compatibility
-        output = io.BytesIO()
-        img.save(output, format="JPEG", quality=95)
-        converted_bytes = output.getvalue()
+        # verify() leaves the image unusable: reopen for the actual decode
+        img = Image.open(image_file)
 
-        return converted_bytes, "image/jpeg"
+        # Convert to JPEG for maximum compatibility (shared with the image splitter)
+        return _encode_jpeg(_flatten_to_rgb(img)), "image/jpeg"
 
     except Image.UnidentifiedImageError as e:
         raise ValueError(f"Invalid image file: {str(e)}")
@@ -72,16 +83,34 @@ def validate_human_image(file_bytes: bytes) -> tuple[bytes, str]:
         raise ValueError(f"Error processing image: {str(e)}")
 
 
-def validate_clothing_items(clothing_items: list[ClothingItemSchema]) -> bool:
+def parse_clothing_urls(clothing_urls: str) -> list[str]:
+    """
+    Split the comma-separated clothing_urls form field into stripped URLs.
+
+    Empty entries are kept so validate_clothing_items can report them.
+
+    Args:
+        clothing_urls: Comma-separated list of clothing item URLs
+
+    Returns:
+        List of stripped URLs, in request order
+    """
+    return [url.strip() for url in clothing_urls.split(",")]
+
+
+def validate_clothing_items(clothing_urls: list[str]) -> bool:
     """
     Validate that 1-3 clothing items are provided with valid URLs.
 
     Validates:
     - 1-3 items are provided
-    - Each item has a valid image URL
+    - Each item has a non-empty image URL
+
+    Checks the raw URL strings directly; ClothingItemSchema is kept for the
+    OpenAPI schema only, so no model is built per URL.
 
     Args:
-        clothing_items: List of ClothingItemSchema objects
+        clothing_urls: List of clothing item image URLs
 
     Returns:
         True if validation passes
@@ -89,17 +118,65 @@ def validate_clothing_items(clothing_items: list[ClothingItemSchema]) -> bool:
     Raises:
         ValueError: If validation fails
     """
-    if not clothing_items:
+    if not clothing_urls:
         raise ValueError("At least one clothing item is required")
 
-    if len(clothing_items) > 3:
+    if len(clothing_urls) > 3:
         raise ValueError(
-            f"Maximum 3 clothing items allowed, got {len(clothing_items)}"
+            f"Maximum 3 clothing items allowed, got {len(clothing_urls)}"
         )
 
     # Validate each item has a URL
-    for idx, item in enumerate(clothing_items, 1):
-        if not item.image_url or not item.image_url.strip():
+    for idx, url in enumerate(clothing_urls, 1):
+        if not url or not url.strip():
             raise ValueError(f"Clothing item {idx} has empty image URL")
 
     return True
+
+
+def build_tryon_cache_key(human_image_bytes: bytes, clothing_urls: list[str]) -> str:
+    """
+    Build the Redis key identifying a try-on request by its inputs.
+
+    The human image content and the (order-independent) clothing URLs are
+    folded into a single SHA-256 digest so the key length stays bounded.
+
+    Args:
+        human_image_bytes: Validated human image bytes
+        clothing_urls: Clothing item image URLs
+
+    Returns:
+        Redis key for the cached result URL
+    """
+    digest = hashlib.sha256(human_image_bytes)
+    for url in sorted(clothing_urls):
+        digest.update(b"|")
+        digest.update(url.encode())
+    return f"tryon:cache:{digest.hexdigest()}"
+
+
+async def get_cached_tryon_url(cache_key: str) -> Optional[str]:
+    """
+    Return a previously generated try-on URL for the same inputs, if any.
+
+    Cache errors are logged and treated as a miss.
+    """
+    try:
+        client = await get_async_redis_client()
+        return await client.get(cache_key)
+    except Exception as e:
+        logger.warning("Try-on cache lookup failed for %s: %s", cache_key, e)
+        return None
+
+
+async def cache_tryon_url(cache_key: str, result_url: str) -> None:
+    """
+    Remember the generated try-on URL for identical future requests.
+
+    Cache errors are logged and otherwise ignored.
+    """
+    try:
+        client = await get_async_redis_client()
+        await client.set(cache_key, result_url, ex=TRYON_CACHE_TTL)
+    except Exception as e:
+        logger.warning("Try-on cache write failed for %s: %s", cache_key, e)
@@ -1,27 +1,81 @@
+import asyncio
+import hashlib
 import io
-import json
 import logging
 import mimetypes
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from typing import Optional
 
+import aiohttp
 import google.genai as genai
+from google.genai import errors as genai_errors
 from google.genai import types
 from PIL import Image
 
-from app.utils.image_workflow.prompt import CATEGORIES
+from app.utils.image_workflow.prompt import CATEGORY_PARTS, TRYON_PROMPT_PART
 
 logger = logging.getLogger(__name__)
 
+try:
+    from turbojpeg import TJPF_GRAY, TJPF_RGB, TJSAMP_420, TJSAMP_GRAY, TurboJPEG
+
+    _TURBO = TurboJPEG()
+except (ImportError, OSError, RuntimeError) as e:  # PyTurboJPEG or a compatible libturbojpeg missing
+    logger.warning("libjpeg-turbo encoder unavailable, falling back to Pillow: %s", e)
+    _TURBO = None
+
+
+class GeminiRateLimitError(Exception):
+    """Gemini rejected the request with 429 RESOURCE_EXHAUSTED (retryable, unlike other 4xx)."""
+
+
+# Process-wide Gemini client, reused so its HTTPS connection pool survives across calls
+_CLIENT: Optional[genai.Client] = None
+_CLIENT_LOCK = threading.Lock()
+
 
 def _get_gemini_client() -> genai.Client:
-    """Initialize and return Gemini API client."""
-    from app.core.config import settings
+    """Initialize (once) and return Gemini API client."""
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                from app.core.config import settings
+
+                api_key = settings.GOOGLE_API_KEY
+                if not api_key:
+                    raise ValueError("GOOGLE_API_KEY is not configured in settings")
+
+                _CLIENT = genai.Client(api_key=api_key)
+    return _CLIENT
 
-    api_key = settings.GOOGLE_API_KEY
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY is not configured in settings")
 
-    return genai.Client(api_key=api_key)
+def reset_gemini_client() -> None:
+    """Drop the cached Gemini client, e.g. in a forked child so sockets are not shared."""
+    global _CLIENT, _CLIENT_LOCK
+    _CLIENT = None
+    _CLIENT_LOCK = threading.Lock()
+
+
+# Long-edge cap for images sent to Gemini (it rescales larger inputs anyway)
+_MAX_IMAGE_EDGE = 2048
+
+# Explicit JPEG encoder options (no optimize/progressive passes, 4:2:0 subsampling)
+_JPEG_SAVE_OPTIONS = {
+    "format": "JPEG",
+    "quality": 95,
+    "optimize": False,
+    "progressive": False,
+    "subsampling": 2,
+}
+_ENCODE_STATE = threading.local()
+
+# Content-addressed LRU of converted images (per worker process)
+_CONVERT_CACHE_SIZE = 64
+_CONVERT_CACHE: "OrderedDict[bytes, tuple[bytes, str]]" = OrderedDict()
+_CONVERT_CACHE_LOCK = threading.Lock()
 
 
 def _get_mime_type(filename: str) -> str:
@@ -30,50 +84,108 @@ def _get_mime_type(filename: str) -> str:
     return mime_type or "application/octet-stream"
 
 
+def _extract_image_data(response: types.GenerateContentResponse) -> bytes:
+    """Return the first inline image of a response (each part carries a whole blob)."""
+    if not response.candidates or not response.candidates[0].content or not response.candidates[0].content.parts:
+        return b""
+    for part in response.candidates[0].content.parts:
+        inline_data = part.inline_data
+        if inline_data and inline_data.data and (inline_data.mime_type or "").startswith("image/"):
+            return inline_data.data
+    return b""
+
+
+def _convert_image(file_content: bytes) -> tuple[bytes, str]:
+    """Decode and re-encode an image to JPEG (raises on invalid input)."""
+    # Open and validate image (header only; pixels are decoded lazily)
+    img = Image.open(io.BytesIO(file_content))
+
+    # Check file integrity without decoding pixels
+    Image.open(io.BytesIO(file_content)).verify()
+
+    # Check image dimensions
+    if img.size[0] < 100 or img.size[1] < 100:
+        logger.warning("Small image detected %s, may not work well", img.size)
+    elif img.format == "JPEG" and img.mode == "RGB" and max(img.size) <= _MAX_IMAGE_EDGE:
+        # Already what Gemini needs: skip decode + JPEG re-encode
+        return file_content, "image/jpeg"
+
+    # Cap oversized inputs: JPEGs decode directly at 1/2, 1/4 or 1/8 scale via draft()
+    if max(img.size) > _MAX_IMAGE_EDGE:
+        img.draft("RGB", (_MAX_IMAGE_EDGE, _MAX_IMAGE_EDGE))
+        img.thumbnail((_MAX_IMAGE_EDGE, _MAX_IMAGE_EDGE), Image.Resampling.LANCZOS)
+
+    # Convert to JPEG for maximum compatibility
+    return _encode_jpeg(_flatten_to_rgb(img)), "image/jpeg"
+
+
+def _flatten_to_rgb(img: Image.Image) -> Image.Image:
+    """Return a JPEG-encodable (RGB or L) version of the image, RGBA composited onto white."""
+    if img.mode == "RGBA":
+        # Composite onto white in one C call (no per-channel split)
+        background = Image.new("RGBA", img.size, (255, 255, 255, 255))
+        return Image.alpha_composite(background, img).convert("RGB")
+    if img.mode not in ("RGB", "L"):
+        return img.convert("RGB")
+    return img
+
+
+def _encode_jpeg(img: Image.Image) -> bytes:
+    """Encode an RGB/L image as JPEG, via libjpeg-turbo when available."""
+    if _TURBO is not None:
+        import numpy as np
+
+        if img.mode == "L":
+            return _TURBO.encode(np.asarray(img), quality=95, pixel_format=TJPF_GRAY, jpeg_subsample=TJSAMP_GRAY)
+        return _TURBO.encode(np.asarray(img), quality=95, pixel_format=TJPF_RGB, jpeg_subsample=TJSAMP_420)
+
+    # Reuse this thread's output buffer instead of allocating one per call
+    output = getattr(_ENCODE_STATE, "buffer", None)
+    if output is None:
+        output = _ENCODE_STATE.buffer = io.BytesIO()
+    output.seek(0)
+    output.truncate(0)
+    img.save(output, **_JPEG_SAVE_OPTIONS)
+    return output.getvalue()
+
+
 def _validate_and_convert_image(file_content: bytes) -> tuple[bytes, str]:
     """
     Validate image format and convert to JPEG for maximum compatibility with Gemini API.
 
+    RGB JPEGs of usable size (long edge up to 2048px) are returned untouched;
+    larger images are downscaled, other formats/modes are decoded and
+    re-encoded. Converted results are kept in a small per-process LRU keyed by
+    content hash, so repeat uploads skip the work.
+
     Args:
         file_content: Raw image bytes
 
     Returns:
         Tuple of (converted_image_bytes, mime_type)
     """
-    try:
-        print(f"[_validate_and_convert_image] Input file size: {len(file_content)} bytes")
-
-        # Open and validate image
-        img = Image.open(io.BytesIO(file_content))
-        print(f"[_validate_and_convert_image] Image format: {img.format}, mode: {img.mode}, size: {img.size}")
-
-        # Check image dimensions
-        if img.size[0] < 100 or img.size[1] < 100:
-            print(f"[_validate_and_convert_image] WARNING: Small image detected {img.size}, may not work well")
-
-        # Convert RGBA to RGB
-        if img.mode == "RGBA":
-            print("[_validate_and_convert_image] Converting RGBA to RGB...")
-            rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-            rgb_img.paste(img, mask=img.split()[3])
-            img = rgb_img
-        elif img.mode not in ("RGB", "L"):
-            print(f"[_validate_and_convert_image] Converting {img.mode} to RGB...")
-            img = img.convert("RGB")
-
-        # Convert to JPEG for maximum compatibility
-        output = io.BytesIO()
-        img.save(output, format="JPEG", quality=95)
-        converted_bytes = output.getvalue()
-
-        print(f"[_validate_and_convert_image] Converted to JPEG: {len(converted_bytes)} bytes")
-        return converted_bytes, "image/jpeg"
+    cache_key = hashlib.blake2b(file_content, digest_size=16).digest()
+    with _CONVERT_CACHE_LOCK:
+        cached = _CONVERT_CACHE.get(cache_key)
+        if cached is not None:
+            _CONVERT_CACHE.move_to_end(cache_key)
+            return cached
 
+    try:
+        result = _convert_image(file_content)
     except Exception as e:
-        print(f"[_validate_and_convert_image] ERROR during validation: {str(e)}")
+        logger.warning("Image validation failed, sending original bytes: %s", e)
         # Return original if conversion fails, but still try
         return file_content, "image/jpeg"
 
+    # Pass-through results cost nothing to recompute; only cache real conversions
+    if result[0] is not file_content:
+        with _CONVERT_CACHE_LOCK:
+            _CONVERT_CACHE[cache_key] = result
+            while len(_CONVERT_CACHE) > _CONVERT_CACHE_SIZE:
+                _CONVERT_CACHE.popitem(last=False)
+    return result
+
 
 def generate_image_from_bytes(file_bytes: bytes, mime_type: str, category: str = "Top") -> bytes:
     """
@@ -85,62 +197,65 @@ def generate_image_from_bytes(file_bytes: bytes, mime_type: str, category: str =
         category: Category key from CATEGORIES (Top or Bot)
 
     Returns:
-        Generated image as bytes
+        Generated image as bytes (empty if Gemini returned no image data)
+
+    Raises:
+        GeminiRateLimitError: If Gemini rate-limited the request (429)
+        google.genai.errors.APIError: For any other Gemini API error
     """
+    logger.debug("[generate_image] Starting image generation for category: %s", category)
+
+    # Get prebuilt prompt part from category
+    prompt_part = CATEGORY_PARTS.get(category, CATEGORY_PARTS["Top"])
+    logger.debug("[generate_image_from_bytes] Using prompt for category: %s", category)
+
+    # Initialize Gemini client
+    client = _get_gemini_client()
+    logger.debug("[generate_image] Gemini client initialized")
+
+    # Create image part from converted bytes
+    image_part = types.Part.from_bytes(
+        data=file_bytes,
+        mime_type=mime_type,
+    )
+
+    # Configure content generation for image output
+    generate_content_config = types.GenerateContentConfig(
+        response_modalities=["IMAGE"],
+        image_config=types.ImageConfig(
+            aspect_ratio="1:1",
+            image_size="1K",
+        ),
+    )
+
+    # Generate image content
+    logger.debug("[generate_image] Starting content generation...")
     try:
-        print(f"[generate_image] Starting image generation for category: {category}")
-
-        # Get prompt from category
-        prompt = CATEGORIES.get(category, CATEGORIES["Top"])
-        print(f"[generate_image_from_bytes] Using prompt for category: {category}")
-
-        # Initialize Gemini client
-        client = _get_gemini_client()
-        print("[generate_image] Gemini client initialized")
-
-        # Create image part from converted bytes
-        image_part = types.Part.from_bytes(
-            data=file_bytes,
-            mime_type=mime_type,
-        )
-
-        # Configure content generation for image output
-        generate_content_config = types.GenerateContentConfig(
-            response_modalities=["IMAGE"],
-            image_config=types.ImageConfig(
-                aspect_ratio="1:1",
-                image_size="1K",
-            ),
-        )
-
-        # Generate image content
-        image_bytes = b""
-        print("[generate_image] Starting content stream generation...")
-
-        for chunk in client.models.generate_content_stream(
+        response = client.models.generate_content(
             model="gemini-2.5-flash-image",
             contents=[
-                types.Part.from_text(text=prompt),
+                prompt_part,
                 image_part,
             ],
             config=generate_content_config,
-        ):
-            # Extract image data from chunks
-            if chunk.candidates is None or chunk.candidates[0].content is None or chunk.candidates[0].content.parts is None:
-                continue
-
-            if chunk.candidates[0].content.parts[0].inline_data and chunk.candidates[0].content.parts[0].inline_data.data:
-                inline_data = chunk.candidates[0].content.parts[0].inline_data
-                image_bytes = inline_data.data
-                print(f"[generate_image] Received image data: {len(image_bytes)} bytes")
+        )
+    except genai_errors.ClientError as e:
+        if e.code == 429:
+            raise GeminiRateLimitError(str(e)) from e
+        raise
+    image_bytes = _extract_image_data(response)
 
-        print(f"[generate_image] Image generation completed, total bytes: {len(image_bytes)}")
-        return image_bytes if image_bytes else b""
+    logger.debug("[generate_image] Image generation completed, total bytes: %d", len(image_bytes))
+    return image_bytes
 
-    except Exception as e:
-        print(f"[generate_image] ERROR: {e}")
-        return b""
 
+async def _download_image(session: aiohttp.ClientSession, url: str) -> bytes:
+    """Download one image over the shared session."""
+    async with session.get(url) as resp:
+        resp.raise_for_status()
+        img_bytes = await resp.read()
+        logger.debug("[generate_tryon_image] Downloaded: %d bytes", len(img_bytes))
+        return img_bytes
 
 
 async def generate_tryon_image(
@@ -159,91 +274,57 @@ async def generate_tryon_image(
     Returns:
         Dict with success, image_bytes, or error
     """
-    import aiohttp
-    from app.utils.redis import get_redis_client
+    from app.utils.redis import set_task_status
     
     try:
-        print(f"[generate_tryon_image] Started: {task_id}")
+        logger.info("[generate_tryon_image] Started: %s", task_id)
         
-        # Download all images
-        print(f"[generate_tryon_image] Downloading {len(clothing_urls)} images")
-        all_images = [human_image_bytes]
-        
-        for url in clothing_urls:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
-                    if resp.status != 200:
-                        raise Exception(f"Download failed: {url} - HTTP {resp.status}")
-                    img_bytes = await resp.read()
-                    all_images.append(img_bytes)
-                    print(f"[generate_tryon_image] Downloaded: {len(img_bytes)} bytes")
+        # Download all clothing images concurrently over one keep-alive session
+        logger.debug("[generate_tryon_image] Downloading %d images", len(clothing_urls))
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=16),
+            timeout=aiohttp.ClientTimeout(total=30, sock_connect=2, sock_read=10),
+        ) as session:
+            downloads = await asyncio.gather(
+                *(_download_image(session, url) for url in clothing_urls),
+                return_exceptions=True,
+            )
+
+        # Every download runs to completion; report all failures at once
+        failures = [f"{url} ({result})" for url, result in zip(clothing_urls, downloads, strict=True) if isinstance(result, BaseException)]
+        if failures:
+            raise Exception(f"Download failed: {'; '.join(failures)}")
+
+        all_images = [human_image_bytes, *downloads]
         
         # Convert all images to parts
-        print(f"[generate_tryon_image] Converting {len(all_images)} images to parts")
-        contents = [types.Part.from_text(text="""Photorealistic virtual try-on result of the person from the input photo. 
-Keep the person’s exact face, body proportions, pose, hairstyle, and lighting. 
-Do not change facial features, gender, ethnicity, or age.
-
-Always remove and replace any existing clothing on the person with the provided items if they cover the same body region. Do not preserve or reuse the original clothing under any circumstances.
-
-Dress the person only with the provided clothing and accessories. 
-Use only visible body areas for try-on:
-- If legs are not visible, ignore pants and shoes.
-- If feet are not visible, ignore footwear.
-- If torso is visible, apply shirts/jackets appropriately.
-- If multiple items cover the same area, pick the most visually complete one.
-
-If the person is already wearing pants or shorts and the lower body is visible, remove the existing pants and replace them with the provided pants. Do not layer two pants together. 
-Only replace clothing if the replacement area has real visible body reference beneath it. 
-
-If the person is already wearing a shirt, t-shirt, or jacket and the torso area is visible, remove the existing top and replace it with the provided top. Do not layer two tops unless the provided item is explicitly a jacket or coat intended to be worn over another top.
-
-If the provided item is a jacket or coat, layer it naturally over the existing or replaced top only if the chest and neck area are sufficiently visible to form a realistic inner clothing layer. If the body reference is not clear enough to generate a believable inner clothing layer, replace the top entirely instead of layering.
-
-If a body region is not fully visible (such as covered by limbs, shadows, occlusion, or cropped), do not hallucinate anatomy or invent missing body parts. Instead, reconstruct the hidden area only to the minimal extent required to correctly fit the provided clothing without unrealistic body fabrication. The person’s real body shape must remain unchanged.
-
-Fit clothing naturally to the body with realistic wrinkles and accurate fabric draping. 
-Align patterns, logos, seams, buttons, and collars with the body as in real clothing. 
-Do not invent new textures, colors, shapes, or outfit items.
-
-No extra objects, no added models, no backgrounds changes. 
-Preserve original photo background and lighting consistency.
-
-Output: a single high-resolution photorealistic try-on image of the person wearing the provided outfit.
-
-""")]
+        logger.debug("[generate_tryon_image] Converting %d images to parts", len(all_images))
+        contents = [TRYON_PROMPT_PART]
         
         for img_bytes in all_images:
             contents.append(types.Part.from_bytes(data=img_bytes, mime_type="image/jpeg"))
         
         # Send to Gemini
-        print(f"[generate_tryon_image] Sending to Gemini with {len(contents)} parts")
+        logger.debug("[generate_tryon_image] Sending to Gemini with %d parts", len(contents))
         client = _get_gemini_client()
-        
 
-        
-        image_bytes = b""
-        for chunk in client.models.generate_content_stream(
+        # Native async call: this coroutine runs on the API's event loop
+        response = await client.aio.models.generate_content(
             model="gemini-2.5-flash-image",
             contents=contents,
-        ):
-            if chunk.candidates and chunk.candidates[0].content and chunk.candidates[0].content.parts:
-                part = chunk.candidates[0].content.parts[0]
-                if part.inline_data and part.inline_data.data:
-                    image_bytes = part.inline_data.data
-                    print(f"[generate_tryon_image] Received: {len(image_bytes)} bytes")
-        
+        )
+        image_bytes = _extract_image_data(response)
+
         if not image_bytes:
             raise Exception("No image data received from Gemini")
-        
-        print(f"[generate_tryon_image] Success: {len(image_bytes)} bytes")
+
+        logger.info("[generate_tryon_image] Success: %d bytes", len(image_bytes))
         return {"success": True, "task_id": task_id, "image_bytes": image_bytes}
         
     except Exception as e:
-        print(f"[generate_tryon_image] Error: {e}")
+        logger.error("[generate_tryon_image] Error: %s", e)
         try:
-            redis_client = get_redis_client()
-            redis_client.hset(f"tryon_task:{task_id}", mapping={
+            set_task_status(f"tryon_task:{task_id}", {
                 "status": "failed",
                 "error": str(e),
                 "updated_at": datetime.utcnow().isoformat(),
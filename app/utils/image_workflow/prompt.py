@@ -1,3 +1,5 @@
+from google.genai import types
+
 CATEGORIES = {
     "Top": """
 Use the provided full-body photo as reference. Extract and isolate only the top.
@@ -32,3 +34,40 @@ Output a clean, standalone bottom with:
 Goal: fashion e-commerce catalog quality - floating garment on a clean solid contrasting background.
 """
 }
+
+TRYON_PROMPT = """Photorealistic virtual try-on result of the person from the input photo. 
+Keep the person’s exact face, body proportions, pose, hairstyle, and lighting. 
+Do not change facial features, gender, ethnicity, or age.
+
+Always remove and replace any existing clothing on the person with the provided items if they cover the same body region. Do not preserve or reuse the original clothing under any circumstances.
+
+Dress the person only with the provided clothing and accessories. 
+Use only visible body areas for try-on:
+- If legs are not visible, ignore pants and shoes.
+- If feet are not visible, ignore footwear.
+- If torso is visible, apply shirts/jackets appropriately.
+- If multiple items cover the same area, pick the most visually complete one.
+
+If the person is already wearing pants or shorts and the lower body is visible, remove the existing pants and replace them with the provided pants. Do not layer two pants together. 
+Only replace clothing if the replacement area has real visible body reference beneath it. 
+
+If the person is already wearing a shirt, t-shirt, or jacket and the torso area is visible, remove the existing top and replace it with the provided top. Do not layer two tops unless the provided item is explicitly a jacket or coat intended to be worn over another top.
+
+If the provided item is a jacket or coat, layer it naturally over the existing or replaced top only if the chest and neck area are sufficiently visible to form a realistic inner clothing layer. If the body reference is not clear enough to generate a believable inner clothing layer, replace the top entirely instead of layering.
+
+If a body region is not fully visible (such as covered by limbs, shadows, occlusion, or cropped), do not hallucinate anatomy or invent missing body parts. Instead, reconstruct the hidden area only to the minimal extent required to correctly fit the provided clothing without unrealistic body fabrication. The person’s real body shape must remain unchanged.
+
+Fit clothing naturally to the body with realistic wrinkles and accurate fabric draping. 
+Align patterns, logos, seams, buttons, and collars with the body as in real clothing. 
+Do not invent new textures, colors, shapes, or outfit items.
+
+No extra objects, no added models, no backgrounds changes. 
+Preserve original photo background and lighting consistency.
+
+Output: a single high-resolution photorealistic try-on image of the person wearing the provided outfit.
+
+"""
+
+# Prompt parts are built once at import and reused by every request
+CATEGORY_PARTS = {name: types.Part.from_text(text=prompt) for name, prompt in CATEGORIES.items()}
+TRYON_PROMPT_PART = types.Part.from_text(text=TRYON_PROMPT)
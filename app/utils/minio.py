@@ -1,7 +1,13 @@
 import io
 import logging
+import os
+import socket
+import sys
+from functools import lru_cache
 from typing import Optional
 
+import certifi
+import urllib3
 from minio import Minio
 from minio.error import S3Error
 from tenacity import (
@@ -15,28 +21,55 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-minio_client = None
 
+def _build_http_client() -> urllib3.PoolManager:
+    """Build the urllib3 transport used by the MinIO SDK
 
+    Same TLS/retry behaviour as the SDK default, but the pool is sized to the
+    number of concurrent uploads so connections are reused instead of being
+    discarded and re-handshaked, and idle pooled sockets are kept alive.
+    """
+    socket_options = [
+        *urllib3.connection.HTTPConnection.default_socket_options,
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+    if sys.platform == "linux":
+        socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60))
+
+    return urllib3.PoolManager(
+        timeout=urllib3.Timeout(connect=300, read=300),
+        maxsize=settings.MINIO_HTTP_POOL_SIZE,
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=urllib3.Retry(
+            total=5,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504],
+        ),
+        socket_options=socket_options,
+    )
+
+
+@lru_cache(maxsize=1)
 def get_minio_client() -> Minio:
-    global minio_client
-    if minio_client is None:
-        try:
-            minio_client = Minio(
-                settings.MINIO_ENDPOINT,
-                access_key=settings.MINIO_ACCESS_KEY,
-                secret_key=settings.MINIO_SECRET_KEY,
-                secure=settings.MINIO_SECURE,
-            )
-
-            # Cấu hình bucket policy cho public access ngay khi khởi tạo
-            ensure_bucket_public_access(minio_client, settings.MINIO_BUCKET_NAME)
-            ensure_bucket_public_access(minio_client, settings.MINIO_PUBLIC_BUCKET_NAME)
-
-        except Exception as e:
-            logger.exception(f"MinIO client initialization error: {e}")
-            raise
-    return minio_client
+    """Return the process-wide MinIO client (its HTTP pool is thread-safe)"""
+    try:
+        client = Minio(
+            settings.MINIO_ENDPOINT,
+            access_key=settings.MINIO_ACCESS_KEY,
+            secret_key=settings.MINIO_SECRET_KEY,
+            secure=settings.MINIO_SECURE,
+            http_client=_build_http_client(),
+        )
+
+        # Cấu hình bucket policy cho public access ngay khi khởi tạo
+        ensure_bucket_public_access(client, settings.MINIO_BUCKET_NAME)
+        ensure_bucket_public_access(client, settings.MINIO_PUBLIC_BUCKET_NAME)
+
+    except Exception as e:
+        logger.exception(f"MinIO client initialization error: {e}")
+        raise
+    return client
 
 
 def ensure_bucket_public_access(client: Minio, bucket_name: str) -> None:
@@ -99,7 +132,8 @@ def upload_bytes_to_minio(
         if not client.bucket_exists(bucket_name):
             client.make_bucket(bucket_name)
 
-        # Upload bytes directly
+        # Upload bytes directly; payloads above the part size go out as a
+        # multipart upload with parts sent concurrently
         file_size = len(file_bytes)
         file_data = io.BytesIO(file_bytes)
         client.put_object(
@@ -108,6 +142,8 @@ def upload_bytes_to_minio(
             data=file_data,
             length=file_size,
             content_type=content_type,
+            part_size=settings.MINIO_UPLOAD_PART_SIZE,
+            num_parallel_uploads=settings.MINIO_UPLOAD_PARALLELISM,
         )
 
         return True
@@ -149,6 +185,13 @@ def delete_file_from_minio(bucket_name: str, object_name: str) -> bool:
         return False
 
 
+def _public_object_url(bucket_name: str, object_name: str) -> str:
+    """Compose the public URL of an object"""
+    if hasattr(settings, "MINIO_PUBLIC_URL") and settings.MINIO_PUBLIC_URL:
+        return f"{settings.MINIO_PUBLIC_URL.rstrip('/').replace('minio', 'storage')}/{bucket_name}/{object_name}"
+    return f"http://{settings.MINIO_PUBLIC_URL.replace('minio', 'storage')}/{bucket_name}/{object_name}"
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=0.5, min=0.5, max=5),
@@ -160,12 +203,7 @@ def generate_presigned_url(bucket_name: str, object_name: str) -> Optional[str]:
         get_minio_client()
 
         # Tạo URL public trực tiếp (bucket đã có public policy)
-        if hasattr(settings, "MINIO_PUBLIC_URL") and settings.MINIO_PUBLIC_URL:
-            public_url = f"{settings.MINIO_PUBLIC_URL.rstrip('/').replace('minio', 'storage')}/{bucket_name}/{object_name}"
-        else:
-            public_url = f"http://{settings.MINIO_PUBLIC_URL.replace('minio', 'storage')}/{bucket_name}/{object_name}"
-
-        return public_url
+        return _public_object_url(bucket_name, object_name)
 
     except S3Error as e:
         logger.exception(f"MinIO URL generation error: {e}")
@@ -1,7 +1,10 @@
 # app/clients/redis_client.py
 import asyncio
 import logging
+from typing import Optional
+from uuid import uuid4
 
+import orjson
 import redis
 from redis import ConnectionPool
 from tenacity import (
@@ -31,6 +34,21 @@ redis_pool = ConnectionPool(
 
 redis_client = redis.Redis(connection_pool=redis_pool)
 
+# Binary-safe pool for staged payloads (image bytes must not be decoded)
+redis_binary_pool = ConnectionPool(
+    host=settings.REDIS_HOST,
+    port=int(settings.REDIS_PORT),
+    db=int(settings.REDIS_DB),
+    decode_responses=False,
+    retry_on_timeout=True,
+    socket_timeout=5,
+    socket_connect_timeout=5,
+    health_check_interval=30,
+    max_connections=50,
+)
+
+redis_binary_client = redis.Redis(connection_pool=redis_binary_pool)
+
 # Async Redis client will be created per event loop
 _async_clients = {}  # Store clients per event loop
 
@@ -68,6 +86,37 @@ def get_redis_client():
             raise
 
 
+def set_task_status(key: str, status: dict, ttl: int = 3600) -> None:
+    """
+    Store the full task status record as one JSON value with its TTL (single SET).
+    """
+    client = get_redis_client()
+    client.set(key, orjson.dumps(status), ex=ttl)
+
+
+def stage_bytes(data: bytes, key_prefix: str, ttl: int = 600) -> str:
+    """
+    Store a binary payload under a fresh key so tasks can pass the key instead of the bytes.
+    """
+    key = f"{key_prefix}{uuid4().hex}"
+    redis_binary_client.set(key, data, ex=ttl)
+    return key
+
+
+def load_staged_bytes(key: str) -> Optional[bytes]:
+    """
+    Load a payload stored by stage_bytes, or None if it expired.
+    """
+    return redis_binary_client.get(key)
+
+
+def delete_staged_bytes(key: str) -> None:
+    """
+    Drop a payload stored by stage_bytes once no task needs it any more.
+    """
+    redis_binary_client.delete(key)
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=0.2, min=0.2, max=2),
@@ -0,0 +1,85 @@
+import hashlib
+import io
+
+import pytest
+from PIL import Image
+
+from app.utils import image_workflow
+from app.utils.image_workflow import _MAX_IMAGE_EDGE, _validate_and_convert_image
+
+
+def _image_bytes(size: tuple[int, int], mode: str = "RGB", fmt: str = "JPEG") -> bytes:
+    color = (200, 30, 30, 128) if mode == "RGBA" else (200, 30, 30)
+    output = io.BytesIO()
+    Image.new(mode, size, color).save(output, format=fmt)
+    return output.getvalue()
+
+
+def _cache_key(file_content: bytes) -> bytes:
+    return hashlib.blake2b(file_content, digest_size=16).digest()
+
+
+@pytest.fixture(autouse=True)
+def clear_convert_cache():
+    image_workflow._CONVERT_CACHE.clear()
+    yield
+    image_workflow._CONVERT_CACHE.clear()
+
+
+def test_rgb_jpeg_within_limit_is_passed_through():
+    original = _image_bytes((640, 480))
+
+    converted, mime_type = _validate_and_convert_image(original)
+
+    assert converted is original
+    assert mime_type == "image/jpeg"
+    assert not image_workflow._CONVERT_CACHE
+
+
+def test_oversized_jpeg_is_downscaled_to_long_edge():
+    original = _image_bytes((4000, 1000))
+
+    converted, mime_type = _validate_and_convert_image(original)
+
+    img = Image.open(io.BytesIO(converted))
+    assert mime_type == "image/jpeg"
+    assert img.format == "JPEG"
+    assert max(img.size) <= _MAX_IMAGE_EDGE
+    assert img.size[0] / img.size[1] == pytest.approx(4.0, rel=0.01)
+
+
+def test_rgba_png_is_flattened_to_rgb_jpeg():
+    converted, mime_type = _validate_and_convert_image(_image_bytes((300, 300), mode="RGBA", fmt="PNG"))
+
+    img = Image.open(io.BytesIO(converted))
+    assert mime_type == "image/jpeg"
+    assert img.format == "JPEG"
+    assert img.mode == "RGB"
+
+
+def test_invalid_bytes_fall_back_to_original():
+    original = b"not an image"
+
+    assert _validate_and_convert_image(original) == (original, "image/jpeg")
+
+
+def test_converted_result_is_served_from_cache():
+    original = _image_bytes((300, 300), fmt="PNG")
+
+    first = _validate_and_convert_image(original)
+    second = _validate_and_convert_image(original)
+
+    assert second is first
+    assert len(image_workflow._CONVERT_CACHE) == 1
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(image_workflow, "_CONVERT_CACHE_SIZE", 2)
+    first, second, third = (_image_bytes((300 + i, 300), fmt="PNG") for i in range(3))
+
+    _validate_and_convert_image(first)
+    _validate_and_convert_image(second)
+    _validate_and_convert_image(first)  # refresh: second is now least recently used
+    _validate_and_convert_image(third)
+
+    assert list(image_workflow._CONVERT_CACHE) == [_cache_key(first), _cache_key(third)]
@@ -0,0 +1,62 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.services.virtual_tryon_service import (
+    build_tryon_cache_key,
+    parse_clothing_urls,
+    validate_clothing_items,
+    validate_human_image,
+)
+
+URLS = ["https://example.com/a.jpg", "https://example.com/b.jpg"]
+
+
+def test_cache_key_ignores_clothing_url_order():
+    assert build_tryon_cache_key(b"human", URLS) == build_tryon_cache_key(b"human", list(reversed(URLS)))
+
+
+def test_cache_key_depends_on_inputs():
+    key = build_tryon_cache_key(b"human", URLS)
+
+    assert key.startswith("tryon:cache:")
+    assert key != build_tryon_cache_key(b"other human", URLS)
+    assert key != build_tryon_cache_key(b"human", URLS[:1])
+
+
+def test_parse_clothing_urls_strips_whitespace():
+    assert parse_clothing_urls(" https://example.com/a.jpg ,https://example.com/b.jpg") == URLS
+
+
+def test_parse_clothing_urls_keeps_empty_entries_for_validation():
+    urls = parse_clothing_urls("https://example.com/a.jpg, ,")
+
+    assert urls == ["https://example.com/a.jpg", "", ""]
+    with pytest.raises(ValueError, match="Clothing item 2 has empty image URL"):
+        validate_clothing_items(urls)
+
+
+def test_validate_clothing_items_limits_count():
+    assert validate_clothing_items(URLS)
+    with pytest.raises(ValueError, match="Maximum 3 clothing items"):
+        validate_clothing_items(parse_clothing_urls("a,b,c,d"))
+
+
+def _jpeg_bytes() -> bytes:
+    output = io.BytesIO()
+    Image.effect_noise((400, 300), 50).convert("RGB").save(output, format="JPEG")
+    return output.getvalue()
+
+
+def test_valid_jpeg_is_passed_through():
+    data = _jpeg_bytes()
+
+    assert validate_human_image(io.BytesIO(data)) == (data, "image/jpeg")
+
+
+def test_truncated_jpeg_is_rejected():
+    data = _jpeg_bytes()
+
+    with pytest.raises(ValueError, match="truncated"):
+        validate_human_image(io.BytesIO(data[: len(data) // 2]))